@@ -1,16 +1,38 @@
+import hmac
 import os
 import re
+import time
 import uuid
+import queue
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterable
 
+import orjson
 import requests
+import tiktoken
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from openai import OpenAI
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct
-from youtube_transcript_api import YouTubeTranscriptApi
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    MatchValue,
+    PayloadSchemaType,
+    PointStruct,
+)
+from youtube_transcript_api import (
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    YouTubeTranscriptApi,
+)
 
 # Configure logging for Vercel
 import sys
@@ -21,69 +43,200 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(JSONProvider):
+    """Serialize responses with orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 BRIAN_CHANNEL_ID = "UC1LJVKQ0hp7sKyfAbKoDHMw"
 COLLECTION_NAME = "brian-transcripts"
 LOOKBACK_DAYS = 14
 MAX_VIDEOS_TO_FETCH = 50
-CHUNK_SIZE = 1500
-TRANSCRIPT_BATCH_SIZE = 5
-TRANSCRIPT_WORKERS = 5
-EMBEDDING_BATCH_SIZE = 32
+# Token-aware chunk sizing: uniform ~500-token chunks with 15% overlap embed
+# more predictably than 1500-character ones, and short tails merge away
+CHUNK_TOKEN_LIMIT = 500
+CHUNK_TOKEN_OVERLAP = 75
+MIN_CHUNK_TOKENS = 100
+# Rough chars-per-chunk figure, only used for the upfront size estimate
+CHUNK_SIZE_ESTIMATE = CHUNK_TOKEN_LIMIT * 4
+TRANSCRIPT_WORKERS = 10
+# Matryoshka truncation: 256 dims halves storage and distance cost vs 512
+# with minor recall loss; must match libs/openai.ts and the collection size
+EMBEDDING_DIMENSIONS = 256
+# How many chunk texts to token-count per encode_batch call
+EMBEDDING_ENCODE_WINDOW = 64
+# Pack embedding requests by token budget instead of a fixed count: small
+# chunks fill bigger batches (fewer RPCs), oversized batches can't 400
+MAX_EMBEDDING_INPUTS = 2048
+MAX_EMBEDDING_TOKENS = 250_000
 QDRANT_UPSERT_BATCH_SIZE = 64
+EXISTENCE_CHECK_WORKERS = 10
+# Only defer HNSW indexing for uploads large enough to amortize the reindex
+BULK_INDEX_THRESHOLD = 100
+HNSW_M = 16
+
+# Compiled once at import instead of per chunk_text_with_overlap call
+_SENT_RE = re.compile(r"(?<=[.!?])\s+")
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_embedding_input(text: str) -> str:
+    """Collapse whitespace runs so the same content always produces the same
+    embedding request body — Helicone's cache keys on the request, so stray
+    newlines or double spaces would otherwise defeat it."""
+    return _WS_RE.sub(" ", text).strip()
+
+# Namespace for deterministic point IDs: the same video chunk always maps to
+# the same UUID, so re-running a partially failed sync replaces points
+# instead of duplicating them
+_POINT_ID_NAMESPACE = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+# Lazy module-level singletons: warm serverless invocations reuse the same
+# connection pools instead of re-negotiating TLS on every request
+_QDRANT_CLIENT: QdrantClient | None = None
+_OPENAI_CLIENT: OpenAI | None = None
+_EMBEDDING_ENCODING: tiktoken.Encoding | None = None
+
+
+def get_embedding_encoding() -> tiktoken.Encoding:
+    global _EMBEDDING_ENCODING
+    if _EMBEDDING_ENCODING is None:
+        _EMBEDDING_ENCODING = tiktoken.encoding_for_model("text-embedding-3-small")
+    return _EMBEDDING_ENCODING
+
+# Shared session so outbound HTTP (YouTube API) reuses sockets via keep-alive
+# instead of paying a TCP+TLS handshake per call; retries with backoff absorb
+# transient 429/5xx responses instead of failing the whole sync
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    ),
+)
+
+# The uploads playlist ID for a channel never changes; cache it for the
+# lifetime of the worker to save one channels.list call per sync
+_UPLOADS_PLAYLIST_CACHE: dict[str, str] = {}
+
+# The YouTube API returns an etag with every playlistItems response; sending
+# it back as If-None-Match turns the common no-new-videos sync into a 304
+# with no response body (and no quota-charged list processing)
+_PLAYLIST_ETAG_CACHE: dict[str, tuple[str, list[dict]]] = {}
 
 
 def get_qdrant_client() -> QdrantClient:
-    url = os.getenv("QDRANT_URL")
-    if not url:
-        logger.error("QDRANT_URL environment variable not set")
-        raise ValueError("QDRANT_URL is required")
-    return QdrantClient(
-        url=url,
-        api_key=os.getenv("QDRANT_API_KEY"),
-        check_compatibility=False,
-    )
+    global _QDRANT_CLIENT
+    if _QDRANT_CLIENT is None:
+        url = os.getenv("QDRANT_URL")
+        if not url:
+            logger.error("QDRANT_URL environment variable not set")
+            raise ValueError("QDRANT_URL is required")
+        _QDRANT_CLIENT = QdrantClient(
+            url=url,
+            api_key=os.getenv("QDRANT_API_KEY"),
+            check_compatibility=False,
+            # gRPC cuts per-call serialization overhead for scrolls/upserts
+            prefer_grpc=True,
+            timeout=30,
+        )
+    return _QDRANT_CLIENT
 
 
 def get_openai_client() -> OpenAI:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        logger.error("OPENAI_API_KEY environment variable not set")
-        raise ValueError("OPENAI_API_KEY is required")
-    return OpenAI(
-        api_key=api_key,
-        base_url="https://oai.helicone.ai/v1",
-        default_headers={
-            "Helicone-Auth": f"Bearer {os.getenv('HELICONE_API_KEY')}",
-            "Helicone-Cache-Enabled": "true",
-        },
-    )
+    global _OPENAI_CLIENT
+    if _OPENAI_CLIENT is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            logger.error("OPENAI_API_KEY environment variable not set")
+            raise ValueError("OPENAI_API_KEY is required")
+        _OPENAI_CLIENT = OpenAI(
+            api_key=api_key,
+            base_url="https://oai.helicone.ai/v1",
+            default_headers={
+                "Helicone-Auth": f"Bearer {os.getenv('HELICONE_API_KEY')}",
+                "Helicone-Cache-Enabled": "true",
+            },
+        )
+    return _OPENAI_CLIENT
 
 
-def chunk_text_with_overlap(text: str, max_chunk_size: int = CHUNK_SIZE) -> list[dict]:
-    sentences = re.split(r"(?<=[.!?])\s+", text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+def chunk_text_with_overlap(text: str, title: str | None = None) -> list[dict]:
+    """Token-aware chunking: pack sentences into ~CHUNK_TOKEN_LIMIT-token
+    chunks with ~15% token overlap between neighbors, merging a sub-minimum
+    tail into the last chunk instead of emitting a stub."""
+    sentences = [s for s in (s.strip() for s in _SENT_RE.split(text)) if s]
     if not sentences:
         return []
 
-    chunks = []
-    current_chunk = []
-    current_length = 0
-
-    for sentence in sentences:
-        sentence_length = len(sentence)
-        if current_length + sentence_length > max_chunk_size and current_chunk:
-            chunks.append({"text": " ".join(current_chunk), "index": len(chunks)})
-            last_sentence = current_chunk[-1]
-            current_chunk = [last_sentence, sentence]
-            current_length = len(last_sentence) + sentence_length + 1
-        else:
-            current_chunk.append(sentence)
-            current_length += sentence_length + (1 if len(current_chunk) > 1 else 0)
+    enc = get_embedding_encoding()
+
+    # Token counts for every sentence in one batch encode; a sentence longer
+    # than a whole chunk (rare in transcripts) is split further on words
+    pieces: list[tuple[str, int]] = []
+    for sentence, tokens in zip(sentences, enc.encode_batch(sentences)):
+        n_tokens = len(tokens)
+        if n_tokens <= CHUNK_TOKEN_LIMIT:
+            pieces.append((sentence, n_tokens))
+            continue
+        words = sentence.split(" ")
+        step = max(1, len(words) * CHUNK_TOKEN_LIMIT // (n_tokens + 1))
+        for i in range(0, len(words), step):
+            segment = " ".join(words[i : i + step])
+            pieces.append((segment, len(enc.encode(segment))))
+
+    n = len(pieces)
+    # suffix_tokens[i] = tokens remaining from piece i onward
+    suffix_tokens = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix_tokens[i] = suffix_tokens[i + 1] + pieces[i][1]
+
+    chunk_texts: list[str] = []
+    start = 0
+    while start < n:
+        end = start + 1
+        tokens = pieces[start][1]
+        while end < n and tokens + pieces[end][1] <= CHUNK_TOKEN_LIMIT:
+            tokens += pieces[end][1]
+            end += 1
+
+        # A stub of a final chunk retrieves worse than a slightly long one
+        if 0 < suffix_tokens[end] < MIN_CHUNK_TOKENS:
+            end = n
+
+        chunk_texts.append(" ".join(piece[0] for piece in pieces[start:end]))
+        if end >= n:
+            break
 
-    if current_chunk:
-        chunks.append({"text": " ".join(current_chunk), "index": len(chunks)})
+        # Walk back ~15% of the token budget so consecutive chunks overlap
+        overlap = 0
+        next_start = end
+        while next_start > start + 1 and overlap < CHUNK_TOKEN_OVERLAP:
+            next_start -= 1
+            overlap += pieces[next_start][1]
+        start = next_start
+
+    chunks = [{"text": t, "index": i} for i, t in enumerate(chunk_texts)]
+
+    # Prefix the title onto the first chunk only, instead of copying the whole
+    # transcript into a title-prefixed intermediate string before splitting
+    if title:
+        chunks[0]["text"] = f"# {title}\n\n{chunks[0]['text']}"
 
     total_chunks = len(chunks)
     for chunk in chunks:
@@ -101,23 +254,29 @@ def fetch_channel_videos(channel_id: str, max_results: int) -> list[dict]:
         logger.error("YOUTUBE_API_KEY environment variable not set")
         raise ValueError("YOUTUBE_API_KEY is required")
 
-    channel_response = requests.get(
-        "https://www.googleapis.com/youtube/v3/channels",
-        params={"part": "contentDetails", "id": channel_id, "key": key},
-        timeout=10,
-    )
-    channel_response.raise_for_status()
-    items = channel_response.json().get("items", [])
-    if not items:
-        return []
-
-    uploads_playlist_id = (
-        items[0].get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads")
-    )
+    uploads_playlist_id = _UPLOADS_PLAYLIST_CACHE.get(channel_id)
     if not uploads_playlist_id:
-        return []
+        channel_response = _SESSION.get(
+            "https://www.googleapis.com/youtube/v3/channels",
+            params={"part": "contentDetails", "id": channel_id, "key": key},
+            timeout=10,
+        )
+        channel_response.raise_for_status()
+        items = channel_response.json().get("items", [])
+        if not items:
+            return []
+
+        uploads_playlist_id = (
+            items[0].get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads")
+        )
+        if not uploads_playlist_id:
+            return []
+        _UPLOADS_PLAYLIST_CACHE[channel_id] = uploads_playlist_id
+
+    cached = _PLAYLIST_ETAG_CACHE.get(uploads_playlist_id)
+    headers = {"If-None-Match": cached[0]} if cached else {}
 
-    playlist_response = requests.get(
+    playlist_response = _SESSION.get(
         "https://www.googleapis.com/youtube/v3/playlistItems",
         params={
             "part": "snippet",
@@ -125,10 +284,14 @@ def fetch_channel_videos(channel_id: str, max_results: int) -> list[dict]:
             "maxResults": max_results,
             "key": key,
         },
+        headers=headers,
         timeout=10,
     )
+    if playlist_response.status_code == 304 and cached:
+        return cached[1]
     playlist_response.raise_for_status()
-    playlist_items = playlist_response.json().get("items", [])
+    playlist_data = playlist_response.json()
+    playlist_items = playlist_data.get("items", [])
 
     videos = []
     for item in playlist_items:
@@ -142,83 +305,193 @@ def fetch_channel_videos(channel_id: str, max_results: int) -> list[dict]:
                 "id": video_id,
                 "title": snippet.get("title", ""),
                 "publishedAt": published_at,
+                # Parsed once here so the lookback filter compares datetimes
+                # directly; cached playlist hits reuse the parsed value too
+                "publishedAtDt": parse_yt_datetime(published_at),
             }
         )
+
+    etag = playlist_data.get("etag")
+    if etag:
+        _PLAYLIST_ETAG_CACHE[uploads_playlist_id] = (etag, videos)
     return videos
 
 
-def get_existing_transcript_video_ids(qdrant: QdrantClient) -> set[str]:
-    seen = set()
-    offset = None
-    while True:
-        result, offset = qdrant.scroll(
+def fetch_videos_details(ids: list[str]) -> dict[str, dict]:
+    """Fetch contentDetails for many videos at once; videos.list accepts up
+    to 50 comma-separated IDs per call (1 quota unit instead of 50).
+
+    Note: contentDetails.caption is "true" only for manually uploaded
+    caption tracks, so it can't be used to pre-filter transcript fetches —
+    auto-generated transcripts (which the transcript API serves fine)
+    report "false". Let the fetch itself decide via TranscriptsDisabled/
+    NoTranscriptFound."""
+    key = os.getenv("YOUTUBE_API_KEY")
+    if not key:
+        raise ValueError("YOUTUBE_API_KEY is required")
+
+    details = {}
+    for i in range(0, len(ids), 50):
+        response = _SESSION.get(
+            "https://www.googleapis.com/youtube/v3/videos",
+            params={
+                "part": "contentDetails",
+                "id": ",".join(ids[i : i + 50]),
+                "key": key,
+            },
+            timeout=10,
+        )
+        response.raise_for_status()
+        for item in response.json().get("items", []):
+            details[item["id"]] = item
+    return details
+
+
+_VIDEO_ID_INDEX_READY = False
+
+# Memo of video IDs this worker knows are in Qdrant. Warm invocations skip
+# the count RPC for videos they have already checked or uploaded; a cold
+# start simply falls through to Qdrant. A few bytes per video, so no need
+# for a bloom filter at this channel's scale.
+_INGESTED_VIDEO_IDS: set[str] = set()
+
+
+def ensure_video_id_index(qdrant: QdrantClient) -> None:
+    global _VIDEO_ID_INDEX_READY
+    if _VIDEO_ID_INDEX_READY:
+        return
+    try:
+        qdrant.create_payload_index(
             collection_name=COLLECTION_NAME,
-            limit=100,
-            with_payload=True,
-            with_vectors=False,
-            offset=offset,
+            field_name="youtubeVideoId",
+            field_schema=PayloadSchemaType.KEYWORD,
         )
-        for point in result:
-            payload = point.payload or {}
-            if payload.get("contentType") != "transcript":
-                continue
-            video_id = payload.get("youtubeVideoId")
-            if video_id:
-                seen.add(video_id)
-            source_url = payload.get("sourceUrl") or ""
-            if "youtube.com/watch?v=" in source_url:
-                match = re.search(r"[?&]v=([^&]+)", source_url)
-                if match:
-                    seen.add(match.group(1))
-        if offset is None:
-            break
-    return seen
+    except Exception:
+        # Index already exists; lookups still work either way
+        logger.debug("Payload index creation skipped", exc_info=True)
+    _VIDEO_ID_INDEX_READY = True
+
+
+def video_already_ingested(qdrant: QdrantClient, video_id: str) -> bool:
+    if video_id in _INGESTED_VIDEO_IDS:
+        return True
+    result = qdrant.count(
+        collection_name=COLLECTION_NAME,
+        count_filter=Filter(
+            must=[
+                FieldCondition(
+                    key="youtubeVideoId", match=MatchValue(value=video_id)
+                )
+            ]
+        ),
+        exact=False,
+    )
+    if result.count > 0:
+        _INGESTED_VIDEO_IDS.add(video_id)
+        return True
+    return False
 
 
 def get_new_videos(qdrant: QdrantClient) -> tuple[list[dict], int]:
     threshold = datetime.now(timezone.utc) - timedelta(days=LOOKBACK_DAYS)
     videos = fetch_channel_videos(BRIAN_CHANNEL_ID, MAX_VIDEOS_TO_FETCH)
-    recent = [v for v in videos if parse_yt_datetime(v["publishedAt"]) >= threshold]
+    recent = [v for v in videos if v["publishedAtDt"] >= threshold]
+
+    if not recent:
+        # Nothing in the lookback window; skip the Qdrant existence checks
+        logger.info("No videos in lookback window")
+        return [], 0
+
+    # One indexed count per candidate beats scrolling the whole collection;
+    # the checks are independent lookups, so run them in parallel
+    ensure_video_id_index(qdrant)
+    with ThreadPoolExecutor(max_workers=EXISTENCE_CHECK_WORKERS) as executor:
+        exists_flags = list(
+            executor.map(lambda v: video_already_ingested(qdrant, v["id"]), recent)
+        )
 
-    existing_ids = get_existing_transcript_video_ids(qdrant)
-    new_videos = [v for v in recent if v["id"] not in existing_ids]
+    new_videos = [v for v, exists in zip(recent, exists_flags) if not exists]
     skipped_existing = len(recent) - len(new_videos)
-    logger.info(f"Found {len(new_videos)} new videos, {skipped_existing} existing")
+    # Lazy %-formatting: the string is only built if the record is emitted
+    logger.info("Found %d new videos, %d existing", len(new_videos), skipped_existing)
     return new_videos, skipped_existing
 
 
-def fetch_transcript_text(video_id: str) -> tuple[str | None, str | None]:
+# Transcripts never change once published, so cache the concatenated text by
+# video ID. /tmp is the only writable path on Vercel and survives across warm
+# invocations; a re-embed run becomes local reads instead of YouTube fetches.
+_TRANSCRIPT_CACHE_DIR = "/tmp/yt-transcript-cache"
+
+
+def _transcript_cache_path(video_id: str) -> str:
+    return os.path.join(_TRANSCRIPT_CACHE_DIR, f"{video_id}.txt")
+
+
+def _read_cached_transcript(video_id: str) -> str | None:
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        text = " ".join(seg.get("text", "") for seg in transcript).strip()
-        if len(text) < 200:
-            return None, "Transcript too short"
-        return text, None
-    except Exception:
-        pass
+        with open(_transcript_cache_path(video_id), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
 
+
+def _write_cached_transcript(video_id: str, text: str) -> None:
     try:
-        api = YouTubeTranscriptApi()
-        transcript = api.fetch(video_id)
-        text = " ".join(snippet.text for snippet in transcript).strip()
-        if len(text) < 200:
-            return None, "Transcript too short"
-        return text, None
-    except Exception as e:
-        return None, f"{type(e).__name__}: {str(e)}"
+        os.makedirs(_TRANSCRIPT_CACHE_DIR, exist_ok=True)
+        with open(_transcript_cache_path(video_id), "w", encoding="utf-8") as f:
+            f.write(text)
+    except OSError:
+        # Cache is best-effort; a full /tmp must not fail the sync
+        logger.debug("Could not cache transcript for %s", video_id, exc_info=True)
+
+
+TRANSCRIPT_FETCH_ATTEMPTS = 3
+
+
+def fetch_transcript_text(video_id: str) -> tuple[str | None, str | None]:
+    cached = _read_cached_transcript(video_id)
+    if cached is not None:
+        return cached, None
+
+    # One call path: the old get_transcript/fetch fallback hit the same
+    # implementation twice, doubling the round trips for every video that
+    # genuinely lacks a transcript. Only transient network errors retry.
+    api = YouTubeTranscriptApi()
+    for attempt in range(TRANSCRIPT_FETCH_ATTEMPTS):
+        try:
+            transcript = api.fetch(video_id)
+        except (TranscriptsDisabled, NoTranscriptFound) as e:
+            # Permanent for this video; retrying would only repeat the call
+            return None, f"{type(e).__name__}: {str(e)}"
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == TRANSCRIPT_FETCH_ATTEMPTS - 1:
+                return None, f"{type(e).__name__}: {str(e)}"
+            time.sleep(0.5 * 2**attempt)
+        except Exception as e:
+            return None, f"{type(e).__name__}: {str(e)}"
+        else:
+            text = " ".join(snippet.text for snippet in transcript).strip()
+            if len(text) < 200:
+                return None, "Transcript too short"
+            _write_cached_transcript(video_id, text)
+            return text, None
+
+    return None, "Unknown transcript fetch error"
 
 
 def fetch_transcripts_batched(videos: list[dict]) -> tuple[list[dict], list[dict]]:
     transcript_rows = []
     failed_videos = []
 
-    for i in range(0, len(videos), TRANSCRIPT_BATCH_SIZE):
-        batch = videos[i : i + TRANSCRIPT_BATCH_SIZE]
-        with ThreadPoolExecutor(max_workers=TRANSCRIPT_WORKERS) as executor:
-            results = list(executor.map(lambda v: fetch_transcript_text(v["id"]), batch))
-
-        for video, result in zip(batch, results):
-            text, error = result
+    # One executor for the whole run: no per-batch thread churn, and a slow
+    # video delays only its own worker instead of the next batch
+    with ThreadPoolExecutor(max_workers=TRANSCRIPT_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_transcript_text, v["id"]): v for v in videos
+        }
+        for future in as_completed(futures):
+            video = futures[future]
+            text, error = future.result()
             if not text:
                 failed_videos.append(
                     {
@@ -241,37 +514,39 @@ def fetch_transcripts_batched(videos: list[dict]) -> tuple[list[dict], list[dict
     return transcript_rows, failed_videos
 
 
-def build_chunks_for_qdrant(transcript_rows: list[dict]) -> tuple[list[dict], list[dict]]:
-    chunk_rows = []
-    uploaded_videos = []
+def iter_chunk_rows(transcript_rows: list[dict], uploaded_videos: list[dict]):
+    """Yield chunk rows one video at a time so the full chunk list is never
+    materialized; per-video results are appended to uploaded_videos as each
+    video's chunks are produced."""
+    # One timestamp per sync; every chunk in the batch shares an upload time
+    uploaded_at = datetime.now(timezone.utc).isoformat()
 
     for row in transcript_rows:
-        full_text = f"# {row['title']}\n\n{row['text']}"
-        chunks = chunk_text_with_overlap(full_text)
+        chunks = chunk_text_with_overlap(row["text"], title=row["title"])
         if not chunks:
             continue
 
-        base_id = str(uuid.uuid4())
+        base_id = str(uuid.uuid5(_POINT_ID_NAMESPACE, row["id"]))
         source_url = f"https://www.youtube.com/watch?v={row['id']}"
 
         for chunk in chunks:
-            chunk_rows.append(
-                {
+            yield {
+                "id": str(
+                    uuid.uuid5(_POINT_ID_NAMESPACE, f"{row['id']}:{chunk['index']}")
+                ),
+                "payload": {
                     "text": chunk["text"],
-                    "payload": {
-                        "text": chunk["text"],
-                        "contentType": "transcript",
-                        "baseId": base_id,
-                        "chunkIndex": chunk["index"],
-                        "totalChunks": chunk["total_chunks"],
-                        "title": row["title"],
-                        "sourceUrl": source_url,
-                        "youtubeVideoId": row["id"],
-                        "publishedAt": row["publishedAt"],
-                        "uploadedAt": datetime.now(timezone.utc).isoformat(),
-                    },
-                }
-            )
+                    "contentType": "transcript",
+                    "baseId": base_id,
+                    "chunkIndex": chunk["index"],
+                    "totalChunks": chunk["total_chunks"],
+                    "title": row["title"],
+                    "sourceUrl": source_url,
+                    "youtubeVideoId": row["id"],
+                    "publishedAt": row["publishedAt"],
+                    "uploadedAt": uploaded_at,
+                },
+            }
 
         uploaded_videos.append(
             {
@@ -282,36 +557,106 @@ def build_chunks_for_qdrant(transcript_rows: list[dict]) -> tuple[list[dict], li
             }
         )
 
-    return chunk_rows, uploaded_videos
+
+def iter_token_budget_batches(chunk_rows: Iterable[dict]):
+    """Greedy-pack chunk rows into embedding batches bounded by the API's
+    token and input-count limits. Token counts come from encode_batch (Rust
+    core) over windows of rows, so the stream is never fully materialized."""
+    enc = get_embedding_encoding()
+    batch: list[dict] = []
+    batch_tokens = 0
+
+    rows_iter = iter(chunk_rows)
+    while True:
+        window = list(islice(rows_iter, EMBEDDING_ENCODE_WINDOW))
+        if not window:
+            break
+        counts = enc.encode_batch([row["payload"]["text"] for row in window])
+        for row, tokens in zip(window, counts):
+            n_tokens = len(tokens)
+            if batch and (
+                batch_tokens + n_tokens > MAX_EMBEDDING_TOKENS
+                or len(batch) >= MAX_EMBEDDING_INPUTS
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(row)
+            batch_tokens += n_tokens
+
+    if batch:
+        yield batch
 
 
 def embed_and_upsert_batched(
-    openai_client: OpenAI, qdrant: QdrantClient, chunk_rows: list[dict]
+    openai_client: OpenAI, qdrant: QdrantClient, chunk_rows: Iterable[dict]
 ) -> None:
-    points = []
-
-    for i in range(0, len(chunk_rows), EMBEDDING_BATCH_SIZE):
-        batch = chunk_rows[i : i + EMBEDDING_BATCH_SIZE]
-        response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=[row["text"] for row in batch],
-            dimensions=512,
-        )
-        vectors = [d.embedding for d in response.data]
+    """Pipeline embedding and upserting: while one batch of points is being
+    upserted in the background, the next embedding request is already in
+    flight, so the two network waits overlap instead of adding up."""
+    points_queue: queue.Queue = queue.Queue(maxsize=2)
+    upsert_errors: list[Exception] = []
+
+    def upsert_consumer() -> None:
+        while True:
+            batch = points_queue.get()
+            if batch is None:
+                return
+            try:
+                for i in range(0, len(batch), QDRANT_UPSERT_BATCH_SIZE):
+                    # wait=False returns once the write is queued, letting the
+                    # next batch upload while this one indexes server-side
+                    qdrant.upsert(
+                        collection_name=COLLECTION_NAME,
+                        points=batch[i : i + QDRANT_UPSERT_BATCH_SIZE],
+                        wait=False,
+                    )
+            except Exception as e:
+                upsert_errors.append(e)
+
+    consumer = threading.Thread(target=upsert_consumer, daemon=True)
+    consumer.start()
+
+    last_point: PointStruct | None = None
+    try:
+        for batch in iter_token_budget_batches(chunk_rows):
+            response = openai_client.embeddings.create(
+                model="text-embedding-3-small",
+                input=[
+                    normalize_embedding_input(row["payload"]["text"])
+                    for row in batch
+                ],
+                dimensions=EMBEDDING_DIMENSIONS,
+            )
+            # Keep vectors as the plain float lists the SDK returns: PointStruct
+            # is a pydantic model that coerces ndarray input back to a list at
+            # construction, so converting to numpy float32 here would add a
+            # copy without changing what gets serialized over gRPC
+            vectors = [d.embedding for d in response.data]
 
-        for row, vector in zip(batch, vectors):
-            points.append(
+            points = [
                 PointStruct(
-                    id=str(uuid.uuid4()),
+                    id=row["id"],
                     vector=vector,
                     payload=row["payload"],
                 )
-            )
-
-    for i in range(0, len(points), QDRANT_UPSERT_BATCH_SIZE):
+                for row, vector in zip(batch, vectors)
+            ]
+            last_point = points[-1]
+            points_queue.put(points)
+    finally:
+        points_queue.put(None)
+        consumer.join()
+
+    if upsert_errors:
+        raise upsert_errors[0]
+
+    # Barrier: updates apply in submission order, so re-upserting the final
+    # point (IDs are deterministic, same data) with wait=True only returns
+    # once every queued wait=False write before it has been applied
+    if last_point is not None:
         qdrant.upsert(
-            collection_name=COLLECTION_NAME,
-            points=points[i : i + QDRANT_UPSERT_BATCH_SIZE],
+            collection_name=COLLECTION_NAME, points=[last_point], wait=True
         )
 
 
@@ -322,7 +667,7 @@ def sync_transcripts() -> dict:
 
     new_videos, skipped_existing = get_new_videos(qdrant)
     if not new_videos:
-        logger.info(f"No new videos. Skipped {skipped_existing} existing")
+        logger.info("No new videos. Skipped %d existing", skipped_existing)
         return {
             "success": True,
             "message": f"No new videos in last {LOOKBACK_DAYS} days",
@@ -332,15 +677,50 @@ def sync_transcripts() -> dict:
             "videos": [],
         }
 
-    logger.info(f"Processing {len(new_videos)} new videos")
+    logger.info("Processing %d new videos", len(new_videos))
     transcript_rows, failed_videos = fetch_transcripts_batched(new_videos)
-    chunk_rows, uploaded_videos = build_chunks_for_qdrant(transcript_rows)
 
-    if chunk_rows:
-        logger.info(f"Upserting {len(chunk_rows)} chunks to Qdrant")
-        embed_and_upsert_batched(openai_client, qdrant, chunk_rows)
+    uploaded_videos: list[dict] = []
+    if transcript_rows:
+        # Rough chunk-count estimate (chunks stream through a generator now,
+        # so the exact total isn't known up front)
+        estimated_chunks = (
+            sum(len(row["text"]) for row in transcript_rows) // CHUNK_SIZE_ESTIMATE
+            + len(transcript_rows)
+        )
+        logger.info("Upserting ~%d chunks to Qdrant", estimated_chunks)
+
+        # For big syncs, defer HNSW graph construction while chunks stream in
+        # and rebuild once at the end instead of incrementally per batch
+        bulk = estimated_chunks > BULK_INDEX_THRESHOLD
+        if bulk:
+            try:
+                qdrant.update_collection(
+                    collection_name=COLLECTION_NAME,
+                    hnsw_config=HnswConfigDiff(m=0),
+                )
+            except Exception:
+                logger.warning("Could not defer HNSW indexing", exc_info=True)
+                bulk = False
+
+        try:
+            embed_and_upsert_batched(
+                openai_client, qdrant, iter_chunk_rows(transcript_rows, uploaded_videos)
+            )
+        finally:
+            if bulk:
+                qdrant.update_collection(
+                    collection_name=COLLECTION_NAME,
+                    hnsw_config=HnswConfigDiff(m=HNSW_M),
+                )
 
-    logger.info(f"Sync complete: {len(uploaded_videos)} uploaded, {len(failed_videos)} failed")
+        # Only memoize after the upserts succeeded; a failed sync must be
+        # re-checked against Qdrant next run
+        _INGESTED_VIDEO_IDS.update(v["id"] for v in uploaded_videos)
+
+    logger.info(
+        "Sync complete: %d uploaded, %d failed", len(uploaded_videos), len(failed_videos)
+    )
     return {
         "success": True,
         "message": f"Processed videos from last {LOOKBACK_DAYS} days",
@@ -351,38 +731,46 @@ def sync_transcripts() -> dict:
     }
 
 
+# Resolved once at import: the secret can't change without a redeploy, so
+# there's no reason to hit the environment on every request
+_CRON_SECRET = os.getenv("CRON_SECRET")
+_EXPECTED_AUTH = f"Bearer {_CRON_SECRET}" if _CRON_SECRET else None
+
+
 def verify_auth(authorization: str | None) -> bool:
-    cron_secret = os.getenv("CRON_SECRET")
-    if not cron_secret:
+    if _EXPECTED_AUTH is None:
         return True
     if not authorization:
         return False
-    return authorization == f"Bearer {cron_secret}"
+    # Constant-time compare so the check doesn't leak prefix matches.
+    # Compare bytes: compare_digest rejects non-ASCII str, and the header
+    # value is attacker-controlled
+    return hmac.compare_digest(
+        authorization.encode("utf-8", "surrogateescape"),
+        _EXPECTED_AUTH.encode("utf-8", "surrogateescape"),
+    )
 
 
 @app.route("/api/youtube-transcripts", methods=["GET"])
 @app.route("/youtube-transcripts", methods=["GET"])
 @app.route("/", methods=["GET"])
 def youtube_transcripts():
-    print(f"[INFO] Request from {request.remote_addr}")
-    logger.info(f"Request from {request.remote_addr}")
+    # Logger already writes to stdout; no need to double-emit via print
+    logger.info("Request from %s", request.remote_addr)
 
     if not verify_auth(request.headers.get("Authorization")):
-        print("[WARNING] Unauthorized request")
         logger.warning("Unauthorized")
         return jsonify({"error": "Unauthorized"}), 401
 
+    # The sync runs inline: Vercel freezes the instance once the response is
+    # sent, so a background thread would never get CPU time to finish
     try:
-        print("[INFO] Starting sync_transcripts")
         result = sync_transcripts()
-        print(f"[SUCCESS] Sync completed: {result}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sync completed: %s", result)
         return jsonify(result)
     except Exception as e:
-        error_msg = f"{type(e).__name__}: {str(e)}"
-        print(f"[ERROR] {error_msg}")
-        import traceback
-        print(traceback.format_exc())
-        logger.error(f"Error: {error_msg}", exc_info=True)
+        logger.error("Error: %s: %s", type(e).__name__, e, exc_info=True)
         return jsonify({"error": "Failed to sync YouTube transcripts", "details": str(e)}), 500
 
 
@@ -4,6 +4,10 @@ import { qdrantClient, COLLECTIONS } from '@/libs/qdrant';
 import { generateEmbedding } from '@/libs/openai';
 import assert from 'assert';
 
+// Posts are independent; keep a few stores in flight instead of awaiting
+// one embedding + upsert round trip per post
+const STORE_CONCURRENCY = 6;
+
 type AuthoredUpPost = {
 	urn?: string;
 	text?: string;
@@ -92,7 +96,10 @@ async function checkExistingUrns(urns: string[]): Promise<Set<string>> {
 	return existingUrns;
 }
 
-async function storePost(post: AuthoredUpPost): Promise<string | null> {
+async function storePost(
+	post: AuthoredUpPost,
+	uploadedAt: string
+): Promise<string | null> {
 	if (!post.text || post.text.length < 10) {
 		return null;
 	}
@@ -121,7 +128,7 @@ async function storePost(post: AuthoredUpPost): Promise<string | null> {
 			: undefined,
 		createdAt: post.post_published_at,
 		sourceUrl,
-		uploadedAt: new Date().toISOString(),
+		uploadedAt,
 	};
 
 	// Remove undefined values
@@ -187,26 +194,36 @@ export async function GET(request: NextRequest) {
 			console.log('Duplicate check failed, proceeding without:', e);
 		}
 
+		// Skip posts that already exist
+		const newPosts = posts.filter(
+			(post) => !(post.urn && existingUrns.has(post.urn))
+		);
+		const duplicateCount = posts.length - newPosts.length;
+
 		let storedCount = 0;
 		let skippedCount = 0;
-		let duplicateCount = 0;
 		const storedIds: string[] = [];
 
-		for (const post of posts) {
-			// Skip if already exists
-			if (post.urn && existingUrns.has(post.urn)) {
-				duplicateCount++;
-				continue;
-			}
-
-			const id = await storePost(post);
-			if (id) {
-				storedCount++;
-				storedIds.push(id);
-			} else {
-				skippedCount++;
-			}
-		}
+		// One timestamp per sync; every stored post shares an upload time
+		const uploadedAt = new Date().toISOString();
+		let nextIndex = 0;
+		await Promise.all(
+			Array.from(
+				{ length: Math.min(STORE_CONCURRENCY, newPosts.length) },
+				async () => {
+					while (nextIndex < newPosts.length) {
+						const post = newPosts[nextIndex++];
+						const id = await storePost(post, uploadedAt);
+						if (id) {
+							storedCount++;
+							storedIds.push(id);
+						} else {
+							skippedCount++;
+						}
+					}
+				}
+			)
+		);
 
 		return NextResponse.json({
 			success: true,
@@ -58,7 +58,14 @@ export async function POST(request: NextRequest) {
 		const baseId = uuidv4();
 		const chunkIds: string[] = [];
 
-		// Process each chunk
+		// Process each chunk, overlapping the next embedding request with the
+		// previous chunk's upsert so the two API waits hide each other.
+		// The in-flight promise captures its own rejection so an embedding
+		// failure mid-loop can't leave an unhandled rejection behind; the
+		// captured error is rethrown at the next checkpoint.
+		let pendingUpsert: Promise<unknown> | null = null;
+		let pendingUpsertError: unknown = null;
+
 		for (const chunk of chunks) {
 			// Generate embedding for chunk
 			const embedding = await generateEmbedding(chunk.text);
@@ -79,17 +86,36 @@ export async function POST(request: NextRequest) {
 				...metadata,
 			};
 
+			// Wait for the previous upsert before starting the next one
+			if (pendingUpsert) {
+				await pendingUpsert;
+				if (pendingUpsertError) {
+					throw pendingUpsertError;
+				}
+			}
+
 			// Upload to Qdrant
-			await qdrantClient.upsert(collectionName, {
-				wait: true,
-				points: [
-					{
-						id: chunkId,
-						vector: embedding,
-						payload,
-					},
-				],
-			});
+			pendingUpsert = qdrantClient
+				.upsert(collectionName, {
+					wait: true,
+					points: [
+						{
+							id: chunkId,
+							vector: embedding,
+							payload,
+						},
+					],
+				})
+				.then(undefined, (error) => {
+					pendingUpsertError = error;
+				});
+		}
+
+		if (pendingUpsert) {
+			await pendingUpsert;
+			if (pendingUpsertError) {
+				throw pendingUpsertError;
+			}
 		}
 
 		const response: UploadResponse = {
@@ -1,3 +1,4 @@
+import { createHash } from 'node:crypto';
 import OpenAI from 'openai';
 
 if (!process.env.OPENAI_API_KEY) {
@@ -18,18 +19,100 @@ export const openai = new OpenAI({
 	},
 });
 
-// Helper function to generate embeddings with 512 dimensions
+// text-embedding-3-small supports Matryoshka truncation: 256 dimensions
+// halves vector storage and distance-computation cost vs 512 with only a
+// minor recall loss. Must match the Qdrant collections' vector size.
+export const EMBEDDING_DIMENSIONS = 256;
+
+// OpenAI accepts up to 2048 inputs per embeddings request; keep batches
+// comfortably under the per-request token limit (~8k tokens per input)
+const EMBEDDING_BATCH_SIZE = 128;
+
+// In-process cache keyed by content hash so identical text (re-runs,
+// overlapping chunks, repeated queries) is never embedded twice per process
+const EMBEDDING_CACHE_MAX = 5000;
+const embeddingCache = new Map<string, number[]>();
+
+// Collapse whitespace runs so the same content always produces the same
+// request body (and cache key) — Helicone keys its cache on the request, so
+// stray newlines or trailing spaces would otherwise defeat it
+const WHITESPACE_REGEX = /\s+/g;
+
+function normalizeEmbeddingInput(text: string): string {
+	return text.replace(WHITESPACE_REGEX, ' ').trim();
+}
+
+function embeddingCacheKey(text: string): string {
+	return createHash('sha256').update(text).digest('hex');
+}
+
+function cacheEmbedding(key: string, embedding: number[]): void {
+	if (embeddingCache.size >= EMBEDDING_CACHE_MAX) {
+		// Map preserves insertion order, so the first key is the oldest entry
+		const oldest = embeddingCache.keys().next().value;
+		if (oldest) {
+			embeddingCache.delete(oldest);
+		}
+	}
+	embeddingCache.set(key, embedding);
+}
+
+// Helper function to generate embeddings
 export async function generateEmbedding(text: string): Promise<number[]> {
 	try {
+		const input = normalizeEmbeddingInput(text);
+		const key = embeddingCacheKey(input);
+		const cached = embeddingCache.get(key);
+		if (cached) {
+			return cached;
+		}
+
 		const response = await openai.embeddings.create({
 			model: 'text-embedding-3-small',
-			input: text,
-			dimensions: 512,
+			input,
+			dimensions: EMBEDDING_DIMENSIONS,
 		});
 
+		cacheEmbedding(key, response.data[0].embedding);
 		return response.data[0].embedding;
 	} catch (error) {
 		console.error('Error generating embedding:', error);
 		throw error;
 	}
 }
+
+// Batched variant: one API round-trip per batch instead of one per text
+export async function generateEmbeddings(
+	texts: string[]
+): Promise<number[][]> {
+	try {
+		const inputs = texts.map(normalizeEmbeddingInput);
+		const keys = inputs.map(embeddingCacheKey);
+		const embeddings: (number[] | null)[] = keys.map(
+			(key) => embeddingCache.get(key) ?? null
+		);
+
+		// Only send texts the cache has not seen before
+		const missIndexes = embeddings.flatMap((e, i) => (e ? [] : [i]));
+
+		for (let i = 0; i < missIndexes.length; i += EMBEDDING_BATCH_SIZE) {
+			const batchIndexes = missIndexes.slice(i, i + EMBEDDING_BATCH_SIZE);
+			const response = await openai.embeddings.create({
+				model: 'text-embedding-3-small',
+				input: batchIndexes.map((idx) => inputs[idx]),
+				dimensions: EMBEDDING_DIMENSIONS,
+			});
+
+			response.data.forEach((d, j) => {
+				const idx = batchIndexes[j];
+				embeddings[idx] = d.embedding;
+				cacheEmbedding(keys[idx], d.embedding);
+			});
+		}
+
+		return embeddings as number[][];
+	} catch (error) {
+		console.error('Error generating embeddings:', error);
+		throw error;
+	}
+}
@@ -3,7 +3,23 @@
  * For web scraping and automation
  */
 
-import { chromium } from 'playwright';
+import { type Browser, chromium } from 'playwright';
+
+// Launching Chromium is by far the most expensive step, so share one browser
+// across all calls and open a fresh context per call instead
+let sharedBrowser: Browser | null = null;
+
+async function getBrowser(): Promise<Browser> {
+	if (sharedBrowser?.isConnected()) {
+		return sharedBrowser;
+	}
+
+	sharedBrowser = await chromium.launch({
+		headless: true,
+	});
+
+	return sharedBrowser;
+}
 
 export interface YouTubeSearchResult {
 	title: string;
@@ -14,6 +30,27 @@ export interface YouTubeSearchResult {
 	thumbnail?: string;
 }
 
+// One alternation scan over the upload-time text instead of one substring
+// search per unit; compiled once at module load
+const RECENT_UNITS_REGEX = /hour|day|week/;
+const MONTHS_AGO_REGEX = /(\d+)\s*month/;
+
+// Raw byte count is a poor signal for "rendered": an SPA shell full of script
+// tags can be hundreds of KB with no readable content. Strip script/style
+// blocks and markup and measure the visible text instead.
+const SCRIPT_STYLE_REGEX = /<(script|style)\b[\s\S]*?<\/\1>/gi;
+const TAG_REGEX = /<[^>]+>/g;
+const WHITESPACE_REGEX = /\s+/g;
+const MIN_RENDERED_TEXT_CHARS = 500;
+
+function visibleTextLength(html: string): number {
+	return html
+		.replace(SCRIPT_STYLE_REGEX, ' ')
+		.replace(TAG_REGEX, ' ')
+		.replace(WHITESPACE_REGEX, ' ')
+		.trim().length;
+}
+
 /**
  * Check if a video is within the last 3 months based on upload time text
  */
@@ -21,17 +58,13 @@ function isWithinThreeMonths(uploadTimeText: string): boolean {
 	const lowerText = uploadTimeText.toLowerCase();
 
 	// Include videos from hours, days, and weeks ago
-	if (
-		lowerText.includes('hour') ||
-		lowerText.includes('day') ||
-		lowerText.includes('week')
-	) {
+	if (RECENT_UNITS_REGEX.test(lowerText)) {
 		return true;
 	}
 
 	// Check for months
 	if (lowerText.includes('month')) {
-		const match = lowerText.match(/(\d+)\s*month/);
+		const match = lowerText.match(MONTHS_AGO_REGEX);
 		if (match) {
 			const months = Number.parseInt(match[1]);
 			return months <= 3;
@@ -63,18 +96,13 @@ export async function searchYouTube(
 
 	console.log(`Searching YouTube for: "${query}" (last 3 months only)`);
 
-	let browser;
-	try {
-		// Launch browser in headless mode
-		browser = await chromium.launch({
-			headless: true,
-		});
-
-		const context = await browser.newContext({
-			userAgent:
-				'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-		});
+	const browser = await getBrowser();
+	const context = await browser.newContext({
+		userAgent:
+			'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+	});
 
+	try {
 		const page = await context.newPage();
 
 		// Navigate to YouTube search
@@ -146,8 +174,6 @@ export async function searchYouTube(
 			maxResults,
 		);
 
-		await browser.close();
-
 		// Filter results to only include videos from the last 3 months
 		const results = allResults
 			.filter((video) => isWithinThreeMonths(video.uploadTime))
@@ -158,25 +184,47 @@ export async function searchYouTube(
 		);
 		return results;
 	} catch (error) {
-		if (browser) {
-			await browser.close();
-		}
 		console.error('Error searching YouTube with Playwright:', error);
 		throw error;
+	} finally {
+		await context.close();
 	}
 }
 
 /**
  * Fetch and parse any webpage using Playwright
+ * Pass a selector to return as soon as the content of interest has rendered
  */
-export async function fetchRenderedPage(url: string): Promise<string> {
-	let browser;
+export async function fetchRenderedPage(
+	url: string,
+	waitForSelector?: string,
+): Promise<string> {
+	// Server-rendered pages don't need a browser: try a plain fetch first and
+	// only fall back to the headless render when the response looks like an
+	// empty client-side shell
 	try {
-		browser = await chromium.launch({
-			headless: true,
+		const response = await fetch(url, {
+			headers: {
+				'User-Agent':
+					'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+			},
 		});
 
-		const context = await browser.newContext();
+		const contentType = response.headers.get('content-type') || '';
+		if (response.ok && contentType.includes('text/html')) {
+			const html = await response.text();
+			if (visibleTextLength(html) >= MIN_RENDERED_TEXT_CHARS) {
+				return html;
+			}
+		}
+	} catch {
+		// Fall through to the rendered path
+	}
+
+	const browser = await getBrowser();
+	const context = await browser.newContext();
+
+	try {
 		const page = await context.newPage();
 
 		await page.goto(url, {
@@ -184,17 +232,55 @@ export async function fetchRenderedPage(url: string): Promise<string> {
 			timeout: 30000,
 		});
 
-		// Wait a bit for JavaScript to render
-		await page.waitForTimeout(2000);
+		// Wait for the content of interest instead of sleeping a fixed 2s:
+		// fast pages return immediately, slow ones get a bounded grace period
+		if (waitForSelector) {
+			await page
+				.waitForSelector(waitForSelector, { timeout: 10000 })
+				.catch(() => {});
+		} else {
+			await page
+				.waitForLoadState('networkidle', { timeout: 5000 })
+				.catch(() => {});
+		}
+
+		return await page.content();
+	} finally {
+		await context.close();
+	}
+}
 
-		const html = await page.content();
-		await browser.close();
+/**
+ * Fetch only the first element matching a selector from a rendered page
+ * Serializes just that subtree instead of the full document, so callers that
+ * want one region (e.g. an article body) don't ship hundreds of KB of shell
+ * markup out of the browser context; returns null when the element never
+ * appears
+ */
+export async function fetchRenderedElement(
+	url: string,
+	selector: string,
+): Promise<string | null> {
+	const browser = await getBrowser();
+	const context = await browser.newContext();
 
-		return html;
-	} catch (error) {
-		if (browser) {
-			await browser.close();
+	try {
+		const page = await context.newPage();
+
+		await page.goto(url, {
+			waitUntil: 'domcontentloaded',
+			timeout: 30000,
+		});
+
+		const element = page.locator(selector).first();
+		try {
+			await element.waitFor({ state: 'attached', timeout: 10000 });
+		} catch {
+			return null;
 		}
-		throw error;
+
+		return await element.evaluate((el) => el.outerHTML);
+	} finally {
+		await context.close();
 	}
 }
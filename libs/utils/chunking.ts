@@ -8,12 +8,15 @@ export interface Chunk {
   totalChunks: number;
 }
 
+// Matches runs ending in period, exclamation, or question mark followed by
+// space or end; compiled once at module load rather than per call
+const SENTENCE_REGEX = /[^.!?]+[.!?]+(?:\s|$)|[^.!?]+$/g;
+
 /**
  * Splits text into sentences (roughly)
  */
 function splitIntoSentences(text: string): string[] {
-  // Split on period, exclamation, question mark followed by space or end
-  const sentences = text.match(/[^.!?]+[.!?]+(?:\s|$)|[^.!?]+$/g) || [];
+  const sentences = text.match(SENTENCE_REGEX) || [];
   return sentences.map((s) => s.trim()).filter((s) => s.length > 0);
 }
 
@@ -31,52 +34,46 @@ export function chunkTextWithOverlap(
     return [];
   }
 
-  const chunks: Chunk[] = [];
-  let currentChunk: string[] = [];
-  let currentLength = 0;
-  let lastSentence = "";
+  // Precompute sentence lengths once and find chunk boundaries with running
+  // sums, so each sentence is visited once and joined once per chunk
+  const lengths = sentences.map((s) => s.length);
+  const boundaries: Array<{ start: number; end: number }> = [];
 
-  for (let i = 0; i < sentences.length; i++) {
-    const sentence = sentences[i];
-    const sentenceLength = sentence.length;
+  let start = 0;
+  let isFirstChunk = true;
 
-    // If adding this sentence would exceed the limit and we have content
-    if (currentLength + sentenceLength > maxChunkSize && currentChunk.length > 0) {
-      // Save current chunk
-      const chunkText = currentChunk.join(" ");
-      chunks.push({
-        text: chunkText,
-        index: chunks.length,
-        totalChunks: 0, // Will be updated later
-      });
+  while (start < sentences.length) {
+    let end = start + 1;
+    let running = lengths[start];
 
-      // Start new chunk with last sentence from previous chunk (overlap)
-      lastSentence = currentChunk[currentChunk.length - 1];
-      currentChunk = [lastSentence, sentence];
-      currentLength = lastSentence.length + sentenceLength + 1; // +1 for space
-    } else {
-      // Add sentence to current chunk
-      currentChunk.push(sentence);
-      currentLength += sentenceLength + (currentChunk.length > 1 ? 1 : 0); // +1 for space between sentences
+    // Overlap chunks always take the sentence that triggered the flush
+    if (!isFirstChunk && end < sentences.length) {
+      running += lengths[end] + 1; // +1 for space between sentences
+      end++;
     }
-  }
 
-  // Add final chunk if there's remaining content
-  if (currentChunk.length > 0) {
-    chunks.push({
-      text: currentChunk.join(" "),
-      index: chunks.length,
-      totalChunks: 0,
-    });
-  }
+    while (end < sentences.length && running + lengths[end] <= maxChunkSize) {
+      running += lengths[end] + 1;
+      end++;
+    }
 
-  // Update totalChunks for all chunks
-  const totalChunks = chunks.length;
-  chunks.forEach((chunk) => {
-    chunk.totalChunks = totalChunks;
-  });
+    boundaries.push({ start, end });
+
+    if (end >= sentences.length) {
+      break;
+    }
+
+    // Start the next chunk with the last sentence of this one (overlap)
+    start = end - 1;
+    isFirstChunk = false;
+  }
 
-  return chunks;
+  const totalChunks = boundaries.length;
+  return boundaries.map((boundary, index) => ({
+    text: sentences.slice(boundary.start, boundary.end).join(" "),
+    index,
+    totalChunks,
+  }));
 }
 
 /**
@@ -0,0 +1,58 @@
+/**
+ * CSV parsing helpers for the LinkedIn post export
+ * Shared by the upload and link-backfill scripts
+ */
+
+/**
+ * Parse a single CSV line, handling quoted fields
+ */
+export function parseCSVLine(line: string): string[] {
+	const fields: string[] = [];
+	let currentField = '';
+	let insideQuotes = false;
+
+	for (let i = 0; i < line.length; i++) {
+		const char = line[i];
+
+		if (char === '"') {
+			insideQuotes = !insideQuotes;
+		} else if (char === ',' && !insideQuotes) {
+			fields.push(currentField.trim());
+			currentField = '';
+		} else {
+			currentField += char;
+		}
+	}
+
+	fields.push(currentField.trim());
+	return fields;
+}
+
+/**
+ * Split the export into per-post blocks; posts span multiple lines and each
+ * new post starts with its activity URN
+ */
+export function splitPostBlocks(csvContent: string): string[] {
+	const lines = csvContent.split('\n');
+	const blocks: string[] = [];
+	let currentPostLines: string[] = [];
+
+	for (let i = 1; i < lines.length; i++) {
+		const line = lines[i];
+
+		if (line.trim().startsWith('urn:li:activity:')) {
+			if (currentPostLines.length > 0) {
+				blocks.push(currentPostLines.join('\n'));
+			}
+			currentPostLines = [line];
+		} else {
+			currentPostLines.push(line);
+		}
+	}
+
+	if (currentPostLines.length > 0) {
+		blocks.push(currentPostLines.join('\n'));
+	}
+
+	return blocks;
+}
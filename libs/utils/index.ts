@@ -5,3 +5,4 @@
 
 export * from "./collection";
 export * from "./chunking";
+export * from "./csv";
@@ -1,7 +1,7 @@
 import * as fs from 'fs';
 import * as path from 'path';
-import * as cheerio from 'cheerio';
 import { qdrantClient, COLLECTIONS } from '../libs/qdrant';
+import { parseCSVLine, splitPostBlocks } from '../libs/utils/csv';
 
 /**
  * Update existing Qdrant records with sourceUrl links
@@ -9,39 +9,50 @@ import { qdrantClient, COLLECTIONS } from '../libs/qdrant';
  * For LinkedIn posts: extracts links from CSV
  */
 
+// The canonical link is the only thing we need from each export, so a regex
+// over the raw HTML avoids building a full DOM per file
+const CANONICAL_ANCHOR_REGEX = /<a\b[^>]*\bclass="[^"]*\bp-canonical\b[^"]*"[^>]*>/;
+const HREF_REGEX = /\bhref="([^"]+)"/;
+
+// Updates within a page are independent, so keep a few setPayload calls in
+// flight instead of paying one serial round trip per point
+const UPDATE_CONCURRENCY = 4;
+
+async function forEachConcurrent<T>(
+	items: T[],
+	worker: (item: T) => Promise<void>
+): Promise<void> {
+	let nextIndex = 0;
+	await Promise.all(
+		Array.from({ length: Math.min(UPDATE_CONCURRENCY, items.length) }, async () => {
+			while (nextIndex < items.length) {
+				await worker(items[nextIndex++]);
+			}
+		})
+	);
+}
+
+// Every chunk of an article points at the same source file, so cache the
+// extracted link per file instead of re-reading the HTML for each point
+const linkCache = new Map<string, string | undefined>();
+
 // Helper to parse HTML and get canonical link
 function extractLinkFromHTML(filePath: string): string | undefined {
+	if (linkCache.has(filePath)) {
+		return linkCache.get(filePath);
+	}
+
+	let link: string | undefined;
 	try {
 		const html = fs.readFileSync(filePath, 'utf-8');
-		const $ = cheerio.load(html);
-		return $('a.p-canonical').attr('href');
+		const anchor = html.match(CANONICAL_ANCHOR_REGEX)?.[0];
+		link = anchor?.match(HREF_REGEX)?.[1];
 	} catch (error) {
 		console.error(`Error reading HTML file ${filePath}:`, error);
-		return undefined;
 	}
-}
 
-// Helper to parse CSV line (handles quoted fields)
-function parseCSVLine(line: string): string[] {
-	const fields: string[] = [];
-	let currentField = '';
-	let insideQuotes = false;
-
-	for (let i = 0; i < line.length; i++) {
-		const char = line[i];
-
-		if (char === '"') {
-			insideQuotes = !insideQuotes;
-		} else if (char === ',' && !insideQuotes) {
-			fields.push(currentField.trim());
-			currentField = '';
-		} else {
-			currentField += char;
-		}
-	}
-
-	fields.push(currentField.trim());
-	return fields;
+	linkCache.set(filePath, link);
+	return link;
 }
 
 // Build mapping of post text to link from CSV
@@ -50,32 +61,11 @@ function buildPostLinksMap(csvPath: string): Map<string, string> {
 
 	try {
 		const csvContent = fs.readFileSync(csvPath, 'utf-8');
-		const lines = csvContent.split('\n');
-		let currentPostLines: string[] = [];
-
-		for (let i = 1; i < lines.length; i++) {
-			const line = lines[i];
-
-			if (line.trim().startsWith('urn:li:activity:')) {
-				if (currentPostLines.length > 0) {
-					const fields = parseCSVLine(currentPostLines.join('\n'));
-					const text = fields[1];
-					const link = fields[14]; // link is 15th column (index 14)
-					if (text && link) {
-						linksMap.set(text.trim(), link.trim());
-					}
-				}
-				currentPostLines = [line];
-			} else {
-				currentPostLines.push(line);
-			}
-		}
 
-		// Handle last post
-		if (currentPostLines.length > 0) {
-			const fields = parseCSVLine(currentPostLines.join('\n'));
+		for (const block of splitPostBlocks(csvContent)) {
+			const fields = parseCSVLine(block);
 			const text = fields[1];
-			const link = fields[14];
+			const link = fields[14]; // link is 15th column (index 14)
 			if (text && link) {
 				linksMap.set(text.trim(), link.trim());
 			}
@@ -108,12 +98,12 @@ async function updateArticles() {
 			offset: nextPageOffset,
 		});
 
-		for (const point of scrollResult.points) {
+		await forEachConcurrent(scrollResult.points, async (point) => {
 			try {
 				// Skip if already has sourceUrl
 				if (point.payload?.sourceUrl) {
 					skipped++;
-					continue;
+					return;
 				}
 
 				// Get source file name from payload
@@ -121,7 +111,7 @@ async function updateArticles() {
 				if (!source) {
 					console.log(`Point ${point.id} has no source field, skipping`);
 					skipped++;
-					continue;
+					return;
 				}
 
 				// Extract link from HTML file
@@ -149,7 +139,7 @@ async function updateArticles() {
 				console.error(`Error updating point ${point.id}:`, error);
 				errors++;
 			}
-		}
+		});
 
 		const offset = scrollResult.next_page_offset;
 		nextPageOffset = typeof offset === 'string' || typeof offset === 'number' ? offset : undefined;
@@ -182,19 +172,19 @@ async function updatePosts() {
 			offset: nextPageOffset,
 		});
 
-		for (const point of scrollResult.points) {
+		await forEachConcurrent(scrollResult.points, async (point) => {
 			try {
 				// Skip if already has sourceUrl
 				if (point.payload?.sourceUrl) {
 					skipped++;
-					continue;
+					return;
 				}
 
 				const text = point.payload?.text as string;
 				if (!text) {
 					console.log(`Point ${point.id} has no text field, skipping`);
 					skipped++;
-					continue;
+					return;
 				}
 
 				// Look up link in our map
@@ -220,7 +210,7 @@ async function updatePosts() {
 				console.error(`Error updating point ${point.id}:`, error);
 				errors++;
 			}
-		}
+		});
 
 		const offset = scrollResult.next_page_offset;
 		nextPageOffset = typeof offset === 'string' || typeof offset === 'number' ? offset : undefined;
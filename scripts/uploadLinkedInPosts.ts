@@ -2,7 +2,11 @@ import * as fs from 'fs';
 import * as path from 'path';
 import { v4 as uuidv4 } from 'uuid';
 import { qdrantClient, COLLECTIONS } from '../libs/qdrant';
-import { generateEmbedding } from '../libs/openai';
+import { generateEmbeddings } from '../libs/openai';
+import { parseCSVLine, splitPostBlocks } from '../libs/utils/csv';
+
+// One upsert per batch of points instead of one HTTP round trip per post
+const QDRANT_UPSERT_BATCH_SIZE = 64;
 
 type LinkedInPostMetadata = {
 	urn?: string;
@@ -21,52 +25,13 @@ type LinkedInPostMetadata = {
 	link?: string;
 };
 
-function parseCSVLine(line: string): string[] {
-	const fields: string[] = [];
-	let currentField = '';
-	let insideQuotes = false;
-
-	for (let i = 0; i < line.length; i++) {
-		const char = line[i];
-
-		if (char === '"') {
-			insideQuotes = !insideQuotes;
-		} else if (char === ',' && !insideQuotes) {
-			fields.push(currentField.trim());
-			currentField = '';
-		} else {
-			currentField += char;
-		}
-	}
-
-	fields.push(currentField.trim());
-	return fields;
-}
-
 function parseCSV(
 	csvContent: string
 ): Array<{ text: string; metadata: LinkedInPostMetadata }> {
-	const lines = csvContent.split('\n');
 	const posts: Array<{ text: string; metadata: LinkedInPostMetadata }> = [];
-	let currentPostLines: string[] = [];
-
-	for (let i = 1; i < lines.length; i++) {
-		const line = lines[i];
-
-		if (line.trim().startsWith('urn:li:activity:')) {
-			if (currentPostLines.length > 0) {
-				const post = parsePost(currentPostLines.join('\n'));
-				if (post) posts.push(post);
-			}
-			currentPostLines = [line];
-		} else {
-			currentPostLines.push(line);
-		}
-	}
 
-	if (currentPostLines.length > 0) {
-		const post = parsePost(currentPostLines.join('\n'));
-		console.log({ post });
+	for (const block of splitPostBlocks(csvContent)) {
+		const post = parsePost(block);
 		if (post) posts.push(post);
 	}
 
@@ -124,38 +89,40 @@ function parsePost(
 	};
 }
 
-async function uploadPost(
+type PostPoint = {
+	id: string;
+	vector: number[];
+	payload: Record<string, unknown>;
+};
+
+function buildPoint(
 	text: string,
-	metadata: LinkedInPostMetadata
-): Promise<boolean> {
-	try {
-		const id = uuidv4();
-		const embedding = await generateEmbedding(text);
+	metadata: LinkedInPostMetadata,
+	embedding: number[],
+	uploadedAt: string
+): PostPoint {
+	// Rename 'link' to 'sourceUrl' for consistency
+	const { link, ...restMetadata } = metadata;
 
-		// Rename 'link' to 'sourceUrl' for consistency
-		const { link, ...restMetadata } = metadata;
+	return {
+		id: uuidv4(),
+		vector: embedding,
+		payload: {
+			text,
+			contentType: 'post',
+			...restMetadata,
+			...(link && { sourceUrl: link }),
+			uploadedAt,
+		},
+	};
+}
 
+async function uploadPoints(points: PostPoint[]): Promise<void> {
+	for (let i = 0; i < points.length; i += QDRANT_UPSERT_BATCH_SIZE) {
 		await qdrantClient.upsert(COLLECTIONS.POSTS, {
-			wait: true,
-			points: [
-				{
-					id,
-					vector: embedding,
-					payload: {
-						text,
-						contentType: 'post',
-						...restMetadata,
-						...(link && { sourceUrl: link }),
-						uploadedAt: new Date().toISOString(),
-					},
-				},
-			],
+			wait: false,
+			points: points.slice(i, i + QDRANT_UPSERT_BATCH_SIZE),
 		});
-
-		return true;
-	} catch (error) {
-		console.error('Upload error:', error);
-		return false;
 	}
 }
 
@@ -178,34 +145,20 @@ async function main() {
 		process.exit(0);
 	}
 
-	let successCount = 0;
-	let failCount = 0;
-
-	for (let i = 0; i < posts.length; i++) {
-		const post = posts[i];
+	const uploadedAt = new Date().toISOString();
 
-		try {
-			console.log(`[${i + 1}/${posts.length}] Uploading post`);
+	// One batched embeddings request per 128 posts instead of one per post
+	console.log(`Embedding ${posts.length} posts`);
+	const embeddings = await generateEmbeddings(posts.map((post) => post.text));
 
-			const success = await uploadPost(post.text, post.metadata);
+	const points = posts.map((post, i) =>
+		buildPoint(post.text, post.metadata, embeddings[i], uploadedAt)
+	);
 
-			if (success) {
-				successCount++;
-			} else {
-				failCount++;
-			}
-
-			await new Promise((resolve) => setTimeout(resolve, 500));
-		} catch (error) {
-			failCount++;
-			console.error('Error processing post:', error);
-		}
-	}
+	await uploadPoints(points);
 
 	console.log('Upload complete');
-	console.log(`Successful: ${successCount}`);
-	console.log(`Failed: ${failCount}`);
-	console.log(`Total: ${successCount + failCount}/${posts.length}`);
+	console.log(`Uploaded: ${points.length}/${posts.length}`);
 }
 
 main().catch(console.error);
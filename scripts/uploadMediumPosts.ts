@@ -1,9 +1,10 @@
 import * as fs from 'fs';
 import * as path from 'path';
-import * as cheerio from 'cheerio';
-import { v4 as uuidv4 } from 'uuid';
+import { createHash } from 'node:crypto';
+import * as cheerio from 'cheerio/slim';
+import { v5 as uuidv5 } from 'uuid';
 import { qdrantClient, COLLECTIONS } from '../libs/qdrant';
-import { generateEmbedding } from '../libs/openai';
+import { generateEmbeddings } from '../libs/openai';
 import { chunkTextWithOverlap } from '../libs/utils/chunking';
 
 function parseHTMLFile(filePath: string): {
@@ -17,68 +18,115 @@ function parseHTMLFile(filePath: string): {
 	const title = $('h1.p-name').text().trim();
 	const canonicalLink = $('a.p-canonical').attr('href');
 	const bodySection = $('section[data-field="body"]');
-	let content = '';
 
+	// Collect block texts and join once instead of growing a string per element
+	const parts: string[] = [];
 	bodySection.find('p, h1, h2, h3, h4').each((_, element) => {
 		const text = $(element).text().trim();
 		if (text) {
-			content += text + '\n\n';
+			parts.push(text);
 		}
 	});
 
 	return {
-		text: `${title}\n\n${content}`.trim(),
+		text: `${title}\n\n${parts.join('\n\n')}`.trim(),
 		title,
 		sourceUrl: canonicalLink,
 	};
 }
 
-async function uploadArticle(
-	text: string,
+function contentHash(text: string): string {
+	return createHash('sha256').update(text).digest('hex').slice(0, 32);
+}
+
+// One indexed lookup against Qdrant beats re-embedding an article we already
+// ingested on a previous run; matching on the content hash as well means an
+// edited article re-uploads while unchanged ones skip the whole pipeline
+async function isAlreadyUploaded(
 	fileName: string,
-	metadata?: { title?: string; sourceUrl?: string }
+	hash: string
 ): Promise<boolean> {
 	try {
-		const chunks = chunkTextWithOverlap(text, 1500);
-		const baseId = uuidv4();
-
-		console.log(`Creating ${chunks.length} chunk(s)`);
-
-		for (const chunk of chunks) {
-			const embedding = await generateEmbedding(chunk.text);
-			const chunkId = uuidv4();
-
-			await qdrantClient.upsert(COLLECTIONS.ARTICLES, {
-				wait: true,
-				points: [
-					{
-						id: chunkId,
-						vector: embedding,
-						payload: {
-							text: chunk.text,
-							contentType: 'article',
-							baseId,
-							chunkIndex: chunk.index,
-							totalChunks: chunk.totalChunks,
-							source: fileName,
-							uploadedAt: new Date().toISOString(),
-							...(metadata?.title && { title: metadata.title }),
-							...(metadata?.sourceUrl && {
-								sourceUrl: metadata.sourceUrl,
-							}),
-						},
-					},
+		const existing = await qdrantClient.scroll(COLLECTIONS.ARTICLES, {
+			filter: {
+				must: [
+					{ key: 'source', match: { value: fileName } },
+					{ key: 'contentHash', match: { value: hash } },
 				],
-			});
-		}
+			},
+			limit: 1,
+			with_payload: false,
+			with_vector: false,
+		});
 
-		return true;
+		return existing.points.length > 0;
 	} catch (error) {
-		console.error('Upload error:', error);
+		// Missing collection or lookup failure: fall through to uploading
+		console.warn(`Existence check failed for ${fileName}:`, error);
 		return false;
 	}
 }
 
+type ArticleRow = {
+	id: string;
+	text: string;
+	payload: Record<string, unknown>;
+};
+
+// Structure-of-arrays collection step: chunk rows carry everything needed
+// for embedding and upserting so both can be batched across all articles
+function collectArticleRows(
+	text: string,
+	fileName: string,
+	hash: string,
+	uploadedAt: string,
+	metadata?: { title?: string; sourceUrl?: string }
+): ArticleRow[] {
+	const chunks = chunkTextWithOverlap(text, 1500);
+	const baseId = uuidv5(fileName, QDRANT_ID_NAMESPACE);
+
+	return chunks.map((chunk) => ({
+		id: uuidv5(`${fileName}#${chunk.index}`, QDRANT_ID_NAMESPACE),
+		text: chunk.text,
+		payload: {
+			text: chunk.text,
+			contentType: 'article',
+			baseId,
+			chunkIndex: chunk.index,
+			totalChunks: chunk.totalChunks,
+			source: fileName,
+			contentHash: hash,
+			uploadedAt,
+			...(metadata?.title && { title: metadata.title }),
+			...(metadata?.sourceUrl && {
+				sourceUrl: metadata.sourceUrl,
+			}),
+		},
+	}));
+}
+
+// File reads and existence checks are network/IO-bound, so collect several
+// files at once
+const UPLOAD_CONCURRENCY = 8;
+
+// One upsert per slice of points instead of one per article
+const QDRANT_UPSERT_BATCH_SIZE = 64;
+
+// Only defer HNSW indexing for loads large enough to amortize the reindex;
+// incremental re-runs that add a handful of articles keep indexing inline
+const BULK_INDEX_THRESHOLD = 100;
+const DEFAULT_INDEXING_THRESHOLD = 20000;
+
+// Size gates checked before reading/parsing: a file smaller than the minimum
+// text length can never pass the content check, and anything huge is not a
+// Medium article export worth building a DOM for
+const MIN_HTML_BYTES = 500;
+const MAX_HTML_BYTES = 2 * 1024 * 1024;
+
+// Fixed namespace so point IDs derive deterministically from file + chunk;
+// re-running the script upserts in place instead of duplicating points
+const QDRANT_ID_NAMESPACE = '5f0b4c76-2f27-4a4e-9d4b-2a3f1f1c9b6d';
+
 async function main() {
 	const postsDir = path.join(__dirname, '../data');
 	const files = fs
@@ -87,45 +135,108 @@ async function main() {
 
 	console.log(`Found ${files.length} HTML files to process`);
 
+	const uploadedAt = new Date().toISOString();
+	const rowsByFile: ArticleRow[][] = new Array(files.length).fill(null);
 	let successCount = 0;
 	let failCount = 0;
+	let nextIndex = 0;
 
-	for (let i = 0; i < files.length; i++) {
+	async function collectFile(i: number): Promise<void> {
 		const file = files[i];
 		const filePath = path.join(postsDir, file);
 
 		try {
 			console.log(`[${i + 1}/${files.length}] Processing: ${file}`);
 
+			const { size } = fs.statSync(filePath);
+			if (size < MIN_HTML_BYTES || size > MAX_HTML_BYTES) {
+				console.log(`Skipped (${size} bytes): ${file}`);
+				return;
+			}
+
 			const parsed = parseHTMLFile(filePath);
 
 			if (parsed.text.length < 500) {
 				console.log(`Skipped (too short: ${parsed.text.length} chars)`);
-				continue;
+				return;
 			}
 
-			const success = await uploadArticle(parsed.text, file, {
+			const hash = contentHash(parsed.text);
+			if (await isAlreadyUploaded(file, hash)) {
+				console.log(`Skipped (unchanged): ${file}`);
+				return;
+			}
+
+			rowsByFile[i] = collectArticleRows(parsed.text, file, hash, uploadedAt, {
 				title: parsed.title,
 				sourceUrl: parsed.sourceUrl,
 			});
-
-			if (success) {
-				successCount++;
-				console.log(
-					`Uploaded successfully (${parsed.text.length} chars)${
-						parsed.sourceUrl ? ` - ${parsed.sourceUrl}` : ''
-					}`
-				);
-			} else {
-				failCount++;
-				console.log(`Upload failed`);
-			}
+			successCount++;
 		} catch (error) {
 			failCount++;
 			console.error(`Error processing file:`, error);
 		}
 	}
 
+	// Simple worker pool: each worker pulls the next uncollected file
+	const workers = Array.from(
+		{ length: Math.min(UPLOAD_CONCURRENCY, files.length) },
+		async () => {
+			while (nextIndex < files.length) {
+				const i = nextIndex++;
+				await collectFile(i);
+			}
+		}
+	);
+
+	await Promise.all(workers);
+
+	// Single-pass pipeline over the whole corpus: one embeddings request per
+	// 128 chunks, then one upsert per 64 points, instead of per-article calls
+	const rows = rowsByFile.filter(Boolean).flat();
+
+	if (rows.length > 0) {
+		console.log(`Embedding ${rows.length} chunks from ${successCount} articles`);
+		const vectors = await generateEmbeddings(rows.map((row) => row.text));
+
+		const points = rows.map((row, i) => ({
+			id: row.id,
+			vector: vectors[i],
+			payload: row.payload,
+		}));
+
+		// For a big cold load, pause HNSW index builds while points stream in
+		// and rebuild once at the end instead of interleaving with inserts
+		let bulk = points.length > BULK_INDEX_THRESHOLD;
+		if (bulk) {
+			try {
+				await qdrantClient.updateCollection(COLLECTIONS.ARTICLES, {
+					optimizers_config: { indexing_threshold: 0 },
+				});
+			} catch (error) {
+				console.warn('Could not defer HNSW indexing:', error);
+				bulk = false;
+			}
+		}
+
+		try {
+			for (let i = 0; i < points.length; i += QDRANT_UPSERT_BATCH_SIZE) {
+				await qdrantClient.upsert(COLLECTIONS.ARTICLES, {
+					wait: false,
+					points: points.slice(i, i + QDRANT_UPSERT_BATCH_SIZE),
+				});
+			}
+		} finally {
+			if (bulk) {
+				await qdrantClient.updateCollection(COLLECTIONS.ARTICLES, {
+					optimizers_config: {
+						indexing_threshold: DEFAULT_INDEXING_THRESHOLD,
+					},
+				});
+			}
+		}
+	}
+
 	console.log('Upload complete');
 	console.log(`Successful: ${successCount}`);
 	console.log(`Failed: ${failCount}`);